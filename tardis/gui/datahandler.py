@@ -1,10 +1,6 @@
 import os
-from pkg_resources import parse_version
 
 import numpy as np
-import matplotlib
-import matplotlib.pylab as plt
-
 
 if os.environ.get('QT_API', None)=='pyqt':
     from PyQt4 import QtGui, QtCore
@@ -14,22 +10,10 @@ else:
     raise ImportError('QT_API was not set! Please exit the IPython console\n'
         ' and at the bash prompt use : \n\n export QT_API=pyside \n or\n'
         ' export QT_API=pyqt \n\n For more information refer to user guide.')
-import yaml
 
-from tardis import run_tardis
 from tardis.gui.widgets import MatplotlibWidget, ModelViewer, ShellInfo
 from tardis.gui.widgets import LineInfo, LineInteractionTables
-
-if (parse_version(matplotlib.__version__) >= parse_version('1.4')):
-    matplotlib.style.use('fivethirtyeight')
-else:
-    print("Please upgrade matplotlib to a version >=1.4 for best results!")
-matplotlib.rcParams['font.family'] = 'serif'
-matplotlib.rcParams['font.size'] = 10.0
-matplotlib.rcParams['lines.linewidth'] = 1.0 
-matplotlib.rcParams['axes.formatter.use_mathtext'] = True
-matplotlib.rcParams['axes.edgecolor'] = matplotlib.rcParams['grid.color']
-matplotlib.rcParams['axes.linewidth'] = matplotlib.rcParams['grid.linewidth']
+from tardis.gui.widgets import OPTION_SEPARATOR
 
 class Node(object):
     """Object that serves as the nodes in the TreeModel.
@@ -40,16 +24,22 @@ class Node(object):
             The parent of the node.
         children: list of Node
             The children of the node.
+        row: int
+            The position of the node in the list of its parent's 
+            children. It is 0 for the root.
         data: list of string 
             The data stored on the node. Can be a key or a value.
-        siblings: dictionary 
+        siblings: None/dictionary 
             A dictionary of nodes that are siblings of this node. The 
             keys are the values of the nodes themselves. This is 
             used to keep track of which value the user has selected
             if the parent of this node happens to be a key that can
-            take values from a list.
+            take values from a list. It is None for all other nodes.
 
     """
+    #The tree is made of many small nodes that Qt visits on every repaint,
+    #so avoid a per-instance __dict__.
+    __slots__ = ('parent', 'children', 'data', 'siblings', 'row')
 
     def __init__(self, data, parent=None):
         """Create one node with the data and parent provided.
@@ -91,13 +81,15 @@ class Node(object):
         
         """
         self.parent = parent
+        self.row = 0
         self.children = []
         self.data = data
-        self.siblings = {}  #For 'type' fields. Will store the nodes to 
-                            #enable disable on selection
+        self.siblings = None  #For 'type' fields. Will store the nodes to 
+                              #enable disable on selection
 
     def append_child(self, child):
         """Add a child to this node."""
+        child.row = len(self.children)
         self.children.append(child)
         child.parent = self
 
@@ -142,10 +134,7 @@ class Node(object):
         parent's children. For root the index 0 is returned.
 
         """
-        if self.parent:
-            return self.parent.children.index(self)
-        else:
-            return 0
+        return self.row
 
     def set_data(self, column, value):
         """Set the data for the ith index to the provided value. Returns
@@ -166,8 +155,8 @@ class TreeModel(QtCore.QAbstractItemModel):
     ----------
         root: Node
             Root node of the tree.
-        disabledNodes: list of Node 
-            List of leaf nodes that are not editable currently.
+        disabledNodes: set of Node 
+            Set of leaf nodes that are not editable currently.
         typenodes: list of Node 
             List of nodes that correspond to keys that set container 
             types. Look at tardis configuration template. These are the
@@ -188,7 +177,7 @@ class TreeModel(QtCore.QAbstractItemModel):
         QtCore.QAbstractItemModel.__init__(self, parent)
 
         self.root = Node(["column A"])
-        self.disabledNodes = []
+        self.disabledNodes = set()
         self.typenodes = []
         self.dict_to_tree(dictionary, self.root)
 
@@ -199,9 +188,9 @@ class TreeModel(QtCore.QAbstractItemModel):
 
         """
         if index.isValid():
-            return index.internalPointer().num_columns()
+            return len(index.internalPointer().data)
         else:
-            return self.root.num_columns()
+            return len(self.root.data)
 
     def data(self, index, role):
         """Returns the asked data for the node specified by the modeLabel
@@ -212,9 +201,11 @@ class TreeModel(QtCore.QAbstractItemModel):
         if role != QtCore.Qt.DisplayRole:
             return None
 
-        item = index.internalPointer()
-
-        return item.get_data(index.column())
+        data = index.internalPointer().data
+        column = index.column()
+        if column < len(data):
+            return data[column]
+        return None
 
     def flags(self, index):
         """Return flags for the items whose model index is provided."""
@@ -222,11 +213,11 @@ class TreeModel(QtCore.QAbstractItemModel):
             return QtCore.Qt.NoItemFlags
 
         node = index.internalPointer()
-        if ((node.get_parent() in self.disabledNodes) or 
+        if ((node.parent in self.disabledNodes) or 
             (node in self.disabledNodes)):
             return QtCore.Qt.NoItemFlags
 
-        if node.num_children()==0:
+        if not node.children:
             return (QtCore.Qt.ItemIsEditable | QtCore.Qt.ItemIsEnabled | 
                 QtCore.Qt.ItemIsSelectable)
 
@@ -237,12 +228,8 @@ class TreeModel(QtCore.QAbstractItemModel):
         model index is invalid then the root node is returned.
 
         """
-        if index.isValid():
-            item = index.internalPointer()
-            if item:
-                return item
-
-        return self.root
+        item = index.internalPointer()
+        return item if item is not None else self.root
 
     def headerData(self, section, orientation, role):
         """Returns header data. This is not used in QColumnView. But will
@@ -264,10 +251,10 @@ class TreeModel(QtCore.QAbstractItemModel):
         if parent.isValid() and parent.column() != 0:
             return QtCore.QModelIndex()
 
-        parentItem = self.getItem(parent)
-        childItem = parentItem.get_child(row)
-        if childItem:
-            return self.createIndex(row, column, childItem)
+        item = parent.internalPointer()
+        children = (item if item is not None else self.root).children
+        if row < len(children):
+            return self.createIndex(row, column, children[row])
         else:
             return QtCore.QModelIndex()
 
@@ -294,13 +281,12 @@ class TreeModel(QtCore.QAbstractItemModel):
         if not index.isValid():
             return QtCore.QModelIndex()
 
-        childItem = index.internalPointer()
-        parentItem = childItem.get_parent()
+        parentItem = index.internalPointer().parent
 
-        if parentItem == self.root:
+        if parentItem is self.root:
             return QtCore.QModelIndex()
 
-        return self.createIndex(parentItem.get_index_of_self(), 0, parentItem)
+        return self.createIndex(parentItem.row, 0, parentItem)
 
     def rowCount(self, parent=QtCore.QModelIndex()):
         """The number of rows for a given node. 
@@ -308,9 +294,8 @@ class TreeModel(QtCore.QAbstractItemModel):
         (The number of rows is just the number of children for a node.)
 
         """
-        parentItem = self.getItem(parent)
-
-        return parentItem.num_hildren()
+        item = parent.internalPointer()
+        return len((item if item is not None else self.root).children)
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
         """Set the value as the data at the location pointed by the 
@@ -320,8 +305,10 @@ class TreeModel(QtCore.QAbstractItemModel):
         if role != QtCore.Qt.EditRole:
             return False
 
-        item = self.getItem(index)
-        result = item.setData(index.column(), value)
+        item = index.internalPointer()
+        if item is None:
+            item = self.root
+        result = item.set_data(index.column(), value)
 
         if result:
             self.dataChanged.emit(index, index)
@@ -362,8 +349,9 @@ class TreeModel(QtCore.QAbstractItemModel):
                 sibsdict[parent.get_child(i).get_data(0)] = parent.get_child(i)
 
             typesleaf = node.get_child(0)
+            typesleaf.siblings = {}
             for i in range(typesleaf.num_columns()):
-                sibstrings = typesleaf.get_data(i).split('|_:_|')
+                sibstrings = typesleaf.get_data(i).split(OPTION_SEPARATOR)
             
                 typesleaf.set_data(i, sibstrings[0])
                 sibslist = []
@@ -378,42 +366,75 @@ class TreeModel(QtCore.QAbstractItemModel):
             for i in range(1,typesleaf.num_columns()):
                 key = typesleaf.get_data(i)
                 for nd in typesleaf.siblings[key]:
-                    self.disabledNodes.append(nd)
+                    self.disabledNodes.add(nd)
 
 
     def tree_from_node(self, dictionary, root):
-        """Convert dictionary to tree. Called by dict_to_tree."""
-        for key in dictionary:
-            child = Node([key])
-            root.append_child(child)
-            if isinstance(dictionary[key], dict):
-                self.tree_from_node(dictionary[key], child)
-            elif isinstance(dictionary[key], list):
-                if isinstance(dictionary[key][1], list):
-                    leaf = Node(dictionary[key][1])    
-                else:
-                    leaf = Node([dictionary[key][1]])
-
-                child.append_child(leaf)
-                if key == 'type':
-                    self.typenodes.append(child)
+        """Convert dictionary to tree. Called by dict_to_tree.
+
+        The nested dictionaries are walked with an explicit stack rather
+        than by recursion. Nodes of 'type' keys are collected in
+        typenodes so that dict_to_tree can attach their siblings once
+        the whole tree exists.
+
+        """
+        stack = [(dictionary, root)]
+        while stack:
+            dictionary, parent = stack.pop()
+            for key, value in dictionary.items():
+                child = Node([key])
+                parent.append_child(child)
+                if isinstance(value, dict):
+                    stack.append((value, child))
+                elif isinstance(value, list):
+                    if isinstance(value[1], list):
+                        leaf = Node(value[1])
+                    else:
+                        leaf = Node([value[1]])
+
+                    child.append_child(leaf)
+                    if key == 'type':
+                        self.typenodes.append(child)
+
+    def update_disabled_nodes(self, to_disable, to_enable):
+        """Disable and enable the given sibling nodes and notify the 
+        views with one dataChanged signal that spans all of them.
+
+        Parameters
+        ----------
+            to_disable: list of Node
+                Nodes that stop being editable.
+            to_enable: list of Node
+                Nodes that become editable again. A node present in both
+                lists ends up enabled.
+
+        """
+        self.disabledNodes.update(to_disable)
+        self.disabledNodes.difference_update(to_enable)
+
+        rows = [nd.row for nd in to_disable] + [nd.row for nd in to_enable]
+        if rows:
+            parent = (to_disable or to_enable)[0].parent
+            first, last = min(rows), max(rows)
+            self.dataChanged.emit(
+                self.createIndex(first, 0, parent.children[first]),
+                self.createIndex(last, 0, parent.children[last]))
 
     def dict_from_node(self, node): 
         """Take a node and convert the whole subtree rooted at it into a 
         dictionary.
 
         """
-        children = [node.get_child(i) for i in range(node.num_children())]
-        if len(children) > 1:
+        children = node.children
+        numchildren = len(children)
+        if numchildren > 1:
             dictionary = {}
             for nd in children:
-                if nd in self.disabledNodes:
-                    pass
-                else:
-                    dictionary[nd.get_data(0)] = self.dict_from_node(nd)
+                if nd not in self.disabledNodes:
+                    dictionary[nd.data[0]] = self.dict_from_node(nd)
             return dictionary
-        elif len(children)==1:
-            return children[0].get_data(0)
+        elif numchildren == 1:
+            return children[0].data[0]
 
 
 class TreeDelegate(QtGui.QStyledItemDelegate):
@@ -429,9 +450,9 @@ class TreeDelegate(QtGui.QStyledItemDelegate):
     def createEditor(self, parent, option, index):
         """Create a lineEdit or combobox depending on the type of node."""
         node = index.internalPointer()
-        if node.num_columns()>1:
+        if len(node.data) > 1:
             combobox = QtGui.QComboBox(parent)
-            combobox.addItems([node.get_data(i) for i in range(node.num_columns())])
+            combobox.addItems(node.data)
             combobox.setEditable(False)
             return combobox
         else:
@@ -448,30 +469,21 @@ class TreeDelegate(QtGui.QStyledItemDelegate):
         """
         node = index.internalPointer()
 
-        if node.num_columns() > 1 and node.get_parent().get_data(0) != 'type':
-            selectedIndex = editor.currentIndex()
-            firstItem = node.get_data(0)
-            node.setData(0, str(editor.currentText()))
-            node.setData(selectedIndex, str(firstItem))
-
-        elif node.num_columns() > 1 and node.get_parent().get_data(0) == 'type':
+        if len(node.data) > 1:
             selectedIndex = editor.currentIndex()
-            firstItem = node.get_data(0)
-            node.setData(0, str(editor.currentText()))
-            node.setData(selectedIndex, str(firstItem))
-
-            itemsToDisable = node.siblings[firstItem]
-            itemsToEnable = node.siblings[str(editor.currentText())]
+            selectedItem = str(editor.currentText())
+            firstItem = node.data[0]
+            node.set_data(0, selectedItem)
+            node.set_data(selectedIndex, str(firstItem))
 
-            for nd in itemsToDisable:
-                model.disabledNodes.append(nd)
+            if node.parent.data[0] == 'type':
+                itemsToDisable = node.siblings[firstItem]
+                itemsToEnable = node.siblings[selectedItem]
 
-            for nd in itemsToEnable:
-                if nd in model.disabledNodes:
-                    model.disabledNodes.remove(nd) 
+                model.update_disabled_nodes(itemsToDisable, itemsToEnable)
 
         elif isinstance(editor, QtGui.QLineEdit): 
-            node.setData(0, str(editor.text()))
+            node.set_data(0, str(editor.text()))
         else:
             QtGui.QStyledItemDelegate.setModelData(self, editor, model, index)
     
@@ -484,7 +496,13 @@ class TreeDelegate(QtGui.QStyledItemDelegate):
             self.closeEditor.emit(editor, QtGui.QAbstractItemDelegate.NoHint)
 
 class SimpleTableModel(QtCore.QAbstractTableModel):
-    """Create a table data structure for the table widgets."""
+    """Create a table data structure for the table widgets.
+
+    Rows are handed to the views in batches of fetch_batch_size as they
+    scroll, so long tables are not laid out in full when they are shown.
+
+    """
+    fetch_batch_size = 500
     
     def __init__(self, headerdata=None, iterate_header=(0, 0), 
             index_info=None, parent=None, *args):
@@ -493,70 +511,144 @@ class SimpleTableModel(QtCore.QAbstractTableModel):
         """
         super(SimpleTableModel, self).__init__(parent, *args)
         self.headerdata = headerdata
-        self.arraydata = []
+        self.arraydata = None
+        self.loaded_rows = 0
+        self.column_count = 0
         self.iterate_header = iterate_header
         self.index_info = index_info
+        self.header_cache = {}
+        self.set_header_formatters()
     
     #Implementing methods mandatory for subclassing QAbstractTableModel
     def rowCount(self, parent=QtCore.QModelIndex()):
-        """Return number of rows."""
-        return len(self.arraydata[0])
+        """Return number of rows fetched so far."""
+        return self.loaded_rows
 
     def columnCount(self, parent=QtCore.QModelIndex()):
         """Return number of columns."""
-        return len(self.arraydata)
+        return self.column_count
+
+    def canFetchMore(self, parent=QtCore.QModelIndex()):
+        """Return True if there are rows that have not been fetched yet."""
+        if parent.isValid() or self.arraydata is None:
+            return False
+        return self.loaded_rows < self.arraydata.shape[0]
+
+    def fetchMore(self, parent=QtCore.QModelIndex()):
+        """Make the next batch of rows available to the views."""
+        last = min(self.loaded_rows + self.fetch_batch_size,
+            self.arraydata.shape[0])
+        self.beginInsertRows(parent, self.loaded_rows, last - 1)
+        self.loaded_rows = last
+        self.endInsertRows()
 
     def headerData(self, section, orientation, role=QtCore.Qt.DisplayRole):
-        """Set the header data."""
-        if orientation == QtCore.Qt.Vertical and role == QtCore.Qt.DisplayRole:
-            if self.iterate_header[0] == 1:
-                return self.headerdata[0][0] + str(section + 1)
-            elif self.iterate_header[0] == 2:
-                if self.index_info:
-                    return self.headerdata[0][0] + str(self.index_info[section])
-                else:
-                    return self.headerdata[0][0] + str(section + 1)
-            else:
-                return self.headerdata[0][section]
-        elif orientation == QtCore.Qt.Horizontal and role == QtCore.Qt.DisplayRole:
-            if self.iterate_header[1] == 1:
-                return self.headerdata[1][0] + str(section + 1)
-            elif self.iterate_header[1] == 2:
-                if self.index_info:
-                    return self.headerdata[1][0] + str(self.index_info[section])
-            else:
-                return self.headerdata[1][section]
-        return None
+        """Set the header data. Header strings are built once per
+        section and then served from the header cache.
+
+        """
+        if role != QtCore.Qt.DisplayRole:
+            return None
+        key = (section, orientation)
+        try:
+            return self.header_cache[key]
+        except KeyError:
+            header = self.header_formatters[orientation](section)
+            self.header_cache[key] = header
+            return header
 
     def data(self, index, role=QtCore.Qt.DisplayRole):
         """Return data of specified index and role."""
-        if not index.isValid():
+        if role != QtCore.Qt.DisplayRole:
             return None
-        elif role != QtCore.Qt.DisplayRole:
+        elif not index.isValid():
             return None
-        return (self.arraydata[index.column()][index.row()])
+        #Convert only the cells that Qt asks for to Python numbers.
+        return self.arraydata[index.row(), index.column()].item()
 
     def setData(self, index, value, role=QtCore.Qt.EditRole):
         """Change the data in the model for specified index and role
         to specified value."""
-        if not index.isValid():
+        if role != QtCore.Qt.EditRole:
             return False
-        elif role != QtCore.Qt.EditRole:
+        elif not index.isValid():
             return False
-        self.arraydata[index.column()][index.row()] = value
-        self.emit(QtCore.SIGNAL(
-            'dataChanged(const QModelIndex &, const QModelIndex &)'), 
-            index, index)
+        self.arraydata[index.row(), index.column()] = value
+        self.dataChanged.emit(index, index)
         return True
 
     #Methods used to inderact with the SimpleTableModel
     def update_table(self):
-        """Update table to set all the new data."""
-        for r in range(self.rowCount()):
-            for c in range(self.columnCount()):
-                index = self.createIndex(r, c)
-                self.setData(index, self.arraydata[c][r])
+        """Update table to set all the new data. The views are notified
+        with a single model reset instead of a signal per cell.
+
+        """
+        self.beginResetModel()
+        self.header_cache.clear()
+        self.set_header_formatters()
+        self.endResetModel()
     
     def add_data(self, datain):
-        """Add data to the model."""
-        self.arraydata.append(datain)
+        """Add a column of data to the model."""
+        column = np.asarray(datain)[:, np.newaxis]
+        if (self.arraydata is not None and
+            len(column) != self.arraydata.shape[0]):
+            raise ValueError("Trying to add a column of length %d to a table "
+                "with %d rows." % (len(column), self.arraydata.shape[0]))
+        if self.arraydata is None:
+            self.arraydata = column
+            self.loaded_rows = min(len(column), self.fetch_batch_size)
+        else:
+            self.arraydata = np.hstack((self.arraydata, column))
+        self.column_count = self.arraydata.shape[1]
+
+    def reset_data(self, columns, headerdata=None):
+        """Replace all the data in the model with the given columns, 
+        and the header data if it is given. The views are notified with a
+        single model reset.
+
+        """
+        lengths = [len(column) for column in columns]
+        if len(set(lengths)) > 1:
+            raise ValueError("All columns of a table must have the same "
+                "length, got lengths %s." % lengths)
+        self.beginResetModel()
+        if headerdata is not None:
+            self.headerdata = headerdata
+        self.arraydata = np.column_stack(columns)
+        self.loaded_rows = min(len(self.arraydata), self.fetch_batch_size)
+        self.column_count = self.arraydata.shape[1]
+        self.header_cache.clear()
+        self.set_header_formatters()
+        self.endResetModel()
+
+    def set_header_formatters(self):
+        """Pick the function that builds the header strings for each
+        orientation, based on iterate_header and index_info. Called
+        whenever these may have changed.
+
+        """
+        formatters = {}
+        if self.headerdata is None:
+            self.header_formatters = dict.fromkeys(
+                (QtCore.Qt.Vertical, QtCore.Qt.Horizontal),
+                lambda section: None)
+            return
+        for orientation, i in ((QtCore.Qt.Vertical, 0),
+            (QtCore.Qt.Horizontal, 1)):
+            headers = self.headerdata[i]
+            if self.iterate_header[i] == 1:
+                formatter = lambda section, headers=headers: (
+                    headers[0] + str(section + 1))
+            elif self.iterate_header[i] == 2 and self.index_info:
+                formatter = lambda section, headers=headers: (
+                    headers[0] + str(self.index_info[section]))
+            elif self.iterate_header[i] == 2 and i == 0:
+                formatter = lambda section, headers=headers: (
+                    headers[0] + str(section + 1))
+            elif self.iterate_header[i] == 2:
+                formatter = lambda section: None
+            else:
+                formatter = headers.__getitem__
+            formatters[orientation] = formatter
+        self.header_formatters = formatters
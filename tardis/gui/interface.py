@@ -17,7 +17,6 @@ except ImportError:
 
 from tardis.gui.widgets import Tardis 
 from tardis.gui.datahandler import SimpleTableModel
-from tardis import run_tardis
     
 def show(model):
     """Take an instance of tardis model and display it.
@@ -59,6 +58,8 @@ if __name__=='__main__':
     and call the show function.
 
     """
+    from tardis import run_tardis
+
     yamlfile = sys.argv[1]
     atomfile = sys.argv[2]
     mdl = run_tardis(yamlfile, atomfile)
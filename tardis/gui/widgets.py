@@ -1,16 +1,21 @@
 import os
+import functools
+from pkg_resources import parse_version
 
 import tardis.util.base
 
 if os.environ.get('QT_API', None)=='pyqt':
     from PyQt4 import QtGui, QtCore
+    Slot = QtCore.pyqtSlot
 elif os.environ.get('QT_API', None)=='pyside':
     from PySide import QtGui, QtCore
+    Slot = QtCore.Slot
 else:
     raise ImportError('QT_API was not set! Please exit the IPython console\n'
         ' and at the bash prompt use : \n\n export QT_API=pyside \n or\n'
         ' export QT_API=pyqt \n\n For more information refer to user guide.')
 
+import numpy as np
 import matplotlib
 from matplotlib.figure import *
 import matplotlib.gridspec as gridspec
@@ -18,12 +23,51 @@ from matplotlib.backends.backend_qt4agg import FigureCanvasQTAgg as FigureCanvas
 from matplotlib.backends.backend_qt4 import NavigationToolbar2QT as NavigationToolbar
 from matplotlib import colors
 from matplotlib.patches import Circle
-import matplotlib.pylab as plt
+from matplotlib.collections import PatchCollection
+from matplotlib import cm
 from astropy import units as u
 
 import tardis
 from tardis import analysis, util
 
+#Folder that holds the icons of the main window
+ICONS_PATH = os.path.join(tardis.__path__[0], 'gui', 'images')
+
+@functools.lru_cache(maxsize=None)
+def load_icon(filename):
+    """Return the icon stored in `filename` inside the icons folder.
+
+    The image is only read and decoded the first time it is requested.
+
+    """
+    return QtGui.QIcon(os.path.join(ICONS_PATH, filename))
+
+_matplotlib_configured = False
+
+def configure_matplotlib():
+    """Set the matplotlib style used by the plots of the GUI.
+
+    This is done when the first main window is created rather than on
+    import, and only the first call has an effect.
+
+    """
+    global _matplotlib_configured
+    if _matplotlib_configured:
+        return
+    _matplotlib_configured = True
+
+    if (parse_version(matplotlib.__version__) >= parse_version('1.4')):
+        import matplotlib.style
+        matplotlib.style.use('fivethirtyeight')
+    else:
+        print("Please upgrade matplotlib to a version >=1.4 for best results!")
+    matplotlib.rcParams['font.family'] = 'serif'
+    matplotlib.rcParams['font.size'] = 10.0
+    matplotlib.rcParams['lines.linewidth'] = 1.0
+    matplotlib.rcParams['axes.formatter.use_mathtext'] = True
+    matplotlib.rcParams['axes.edgecolor'] = matplotlib.rcParams['grid.color']
+    matplotlib.rcParams['axes.linewidth'] = matplotlib.rcParams['grid.linewidth']
+
 class MatplotlibWidget(FigureCanvas):
     """Canvas to draw graphs on."""
 
@@ -31,7 +75,7 @@ class MatplotlibWidget(FigureCanvas):
         """Create the canvas. Add toolbar depending on the parent."""
 
         # Force-deactivate LaTeX
-        plt.rcParams["text.usetex"] = False
+        matplotlib.rcParams["text.usetex"] = False
 
         self.tablecreator = tablecreator
         self.parent = parent
@@ -45,6 +89,8 @@ class MatplotlibWidget(FigureCanvas):
             self.ax2 = self.figure.add_subplot(self.gs[1])#, aspect='equal')
         self.cb = None
         self.span = None
+        self.span_tolerance = None
+        self.background = None
 
         super(MatplotlibWidget, self).__init__(self.figure)
         super(MatplotlibWidget, self).setSizePolicy(QtGui.QSizePolicy.Expanding,
@@ -57,6 +103,38 @@ class MatplotlibWidget(FigureCanvas):
         else:
             self.cid[0] = self.figure.canvas.mpl_connect('pick_event',
                 self.on_shell_pick)
+        self.cid[3] = self.figure.canvas.mpl_connect('draw_event',
+            self.on_draw)
+        self.cid[4] = self.figure.canvas.mpl_connect('resize_event',
+            self.on_draw)
+
+    def on_draw(self, event):
+        """Drop the cached background after every full redraw or resize,
+        since anything in the figure may have changed.
+
+        """
+        self.background = None
+
+    def blit_artist(self, artist):
+        """Redraw only `artist` on top of a cached image of the rest of
+        its axes, instead of redrawing the whole figure.
+
+        The image is rendered with the artist hidden the first time and
+        again after every full redraw or resize of the canvas. The axes
+        bbox is frozen along with it, since it cannot change until then.
+
+        """
+        axes = artist.axes
+        if self.background is None or self.background[0] is not artist:
+            artist.set_visible(False)
+            self.draw()
+            bbox = axes.bbox.frozen()
+            self.background = (artist, bbox, self.copy_from_bbox(bbox))
+            artist.set_visible(True)
+        artist, bbox, region = self.background
+        self.restore_region(region)
+        axes.draw_artist(artist)
+        self.blit(bbox)
 
     def show_line_info(self):
         """Show line info for span selected region."""
@@ -72,22 +150,27 @@ class MatplotlibWidget(FigureCanvas):
             if not self.span:
                 self.span = self.ax.axvspan(left, right, color='r', alpha=0.3,
                     picker=self.span_picker)
+                changed = True
             else:
+                changed = not self.span.get_visible()
                 self.span.set_visible(True)
             self.parent.spectrum_line_info_button.show()
             self.parent.spectrum_span_button.setText('Hide Wavelength Range')
         else:
+            changed = self.span.get_visible()
             self.span.set_visible(False)
             self.parent.spectrum_line_info_button.hide()
             self.parent.spectrum_span_button.setText('Show Wavelength Range')
-        self.draw()
+        #Only redraw if the visibility of the span actually changed
+        if changed:
+            self.draw_idle()
 
     def on_span_pick(self, event):
         """Callback to 'pick'(grab with mouse) the span selector tool."""
         self.figure.canvas.mpl_disconnect(self.cid[0])
         self.span.set_edgecolor('m')
         self.span.set_linewidth(5)
-        self.draw()
+        self.draw_idle()
         if event.edge == 'left':
             self.cid[1] = self.figure.canvas.mpl_connect('motion_notify_event',
                 self.on_span_left_motion)
@@ -102,21 +185,22 @@ class MatplotlibWidget(FigureCanvas):
         redraw.
 
         """
-        if mouseevent.xdata < self.span.xy[2][0]:
-            self.span.xy[0][0] = mouseevent.xdata
-            self.span.xy[1][0] = mouseevent.xdata
-            self.span.xy[4][0] = mouseevent.xdata
-            self.draw()
+        verts = self.span.get_xy()
+        if mouseevent.xdata < verts[2, 0]:
+            verts[[0, 1, 4], 0] = mouseevent.xdata
+            self.span.set_xy(verts)
+            self.blit_artist(self.span)
 
     def on_span_right_motion(self, mouseevent):
         """Update data of span selector tool on right movement of mouse and
         redraw.
 
         """
-        if mouseevent.xdata > self.span.xy[0][0]:
-            self.span.xy[2][0] = mouseevent.xdata
-            self.span.xy[3][0] = mouseevent.xdata
-            self.draw()
+        verts = self.span.get_xy()
+        if mouseevent.xdata > verts[0, 0]:
+            verts[[2, 3], 0] = mouseevent.xdata
+            self.span.set_xy(verts)
+            self.blit_artist(self.span)
 
     def on_span_resized(self, mouseevent):
         """Redraw the red rectangle to currently selected span."""
@@ -126,29 +210,32 @@ class MatplotlibWidget(FigureCanvas):
             self.on_span_pick)
         self.span.set_edgecolor('r')
         self.span.set_linewidth(1)
-        self.draw()
+        self.draw_idle()
 
     def on_shell_pick(self, event):
         """Highlight the shell that was picked."""
-        self.highlight_shell(event.artist.index)
+        self.highlight_shell(event.index)
 
     def highlight_shell(self, index):
         """Change edgecolor of highlighted shell."""
         self.parent.tableview.selectRow(index)
-        for i in range(len(self.parent.shells)):
-            if i != index and i != index + 1:
-                self.parent.shells[i].set_edgecolor('k')
-            else:
-                self.parent.shells[i].set_edgecolor('w')
-        self.draw()
+        edgecolors = self.parent.shell_edgecolors.copy()
+        edgecolors[index:index + 2] = (1., 1., 1., 1.)
+        self.parent.shell_collection.set_edgecolors(edgecolors)
+        self.blit_artist(self.parent.shell_collection)
+
+    def shell_picker(self, shell_collection, mouseevent):
+        """Enable picking shells in the shell plot. The index of the
+        picked shell is passed on to the pick event.
 
-    def shell_picker(self, shell, mouseevent):
-        """Enable picking shells in the shell plot."""
+        """
         if mouseevent.xdata is None:
             return False, dict()
         mouse_r2 = mouseevent.xdata ** 2 + mouseevent.ydata ** 2
-        if shell.r_inner ** 2 < mouse_r2 < shell.r_outer ** 2:
-            return True, dict()
+        picked = np.flatnonzero((self.parent.shell_r_inner_sq < mouse_r2) &
+            (mouse_r2 < self.parent.shell_r_outer_sq))
+        if len(picked):
+            return True, dict(index=int(picked[0]))
         return False, dict()
 
     def span_picker(self, span, mouseevent, tolerance=5):
@@ -158,8 +245,14 @@ class MatplotlibWidget(FigureCanvas):
         """
         left = float(span.xy[0][0])
         right = float(span.xy[2][0])
-        tolerance = span.axes.transData.inverted().transform((tolerance, 0)
-            )[0] - span.axes.transData.inverted().transform((0, 0))[0]
+        #The tolerance in data units only changes with the x limits and
+        #the width of the axes, so it is converted once per combination.
+        key = (tolerance, span.axes.get_xlim(), span.axes.bbox.width)
+        if self.span_tolerance is None or self.span_tolerance[0] != key:
+            inverse = span.axes.transData.inverted()
+            self.span_tolerance = (key, inverse.transform((tolerance, 0))[0]
+                - inverse.transform((0, 0))[0])
+        tolerance = self.span_tolerance[1]
         event_attributes = {'edge': None}
         if mouseevent.xdata is None:
             return False, event_attributes
@@ -185,6 +278,170 @@ class Shell(matplotlib.patches.Wedge):
         self.r_inner = r_inner
         self.width = r_outer - r_inner
 
+#Separates the name of a choice for a 'type' key from the names of the
+#sibling keys that apply to that choice in the configuration template.
+OPTION_SEPARATOR = '|_:_|'
+
+def _freeze_template(template):
+    """Return a copy of the configuration template in which every list
+    is replaced by a tuple, so that it cannot be modified by accident.
+
+    """
+    frozen = {}
+    for key, value in template.items():
+        if isinstance(value, dict):
+            frozen[key] = _freeze_template(value)
+        elif isinstance(value, list):
+            frozen[key] = tuple(tuple(item) if isinstance(item, list)
+                else item for item in value)
+        else:
+            frozen[key] = value
+    return frozen
+
+def _clone_template(template):
+    """Return a mutable copy of a template frozen by `_freeze_template`.
+
+    Only the dictionaries and lists are rebuilt, the values stored in them
+    are shared with the frozen template.
+
+    """
+    clone = {}
+    for key, value in template.items():
+        if isinstance(value, dict):
+            clone[key] = _clone_template(value)
+        elif isinstance(value, tuple):
+            clone[key] = [list(item) if isinstance(item, tuple) else item
+                for item in value]
+        else:
+            clone[key] = value
+    return clone
+
+#Template of the tardis configuration, built once at import. Every key maps
+#to a (mandatory, default) tuple. ConfigEditor fills in a mutable clone.
+_CONFIG_TEMPLATE = _freeze_template({'tardis_config_version':[True, 'v1.0'],
+    'supernova':{ 'luminosity_requested':[True, '1 solLum'],
+                  'time_explosion':[True, None],
+                  'distance':[False, None],
+                  'luminosity_wavelength_start':[False, '0 angstrom'],
+                  'luminosity_wavelength_end':[False, 'inf angstrom'],
+                },
+    'atom_data':[True,'File Browser'],
+    'plasma':{ 'initial_t_inner':[False, '-1K'],
+               'initial_t_rad':[False,'10000K'],
+               'disable_electron_scattering':[False, False],
+               'ionization':[True, None],
+               'excitation':[True, None],
+               'radiative_rates_type':[True, None],
+               'line_interaction_type':[True, None],
+               'w_epsilon':[False, 1e-10],
+               'delta_treatment':[False, None],
+               'nlte':{ 'species':[False, []],
+                        'coronal_approximation':[False, False],
+                        'classical_nebular':[False, False]
+                      }
+              },
+    'model':{ 'structure':{'type':[True, ['file|_:_|filename|_:_|'
+    'filetype|_:_|v_inner_boundary|_:_|v_outer_boundary',
+    'specific|_:_|velocity|_:_|density']],
+              'filename':[True, None],
+              'filetype':[True, None],
+              'v_inner_boundary':[False, '0 km/s'],
+              'v_outer_boundary':[False, 'inf km/s'],
+              'velocity':[True, None],
+              'density':{ 'type':[True, ['branch85_w7|_:_|w7_time_0'
+                            '|_:_|w7_time_0|_:_|w7_time_0',
+                            'exponential|_:_|time_0|_:_|rho_0|_:_|'
+                            'v_0','power_law|_:_|time_0|_:_|rho_0'
+                            '|_:_|v_0|_:_|exponent','uniform|_:_|value']],
+                          'w7_time_0':[False, '0.000231481 day'],
+                          'w7_rho_0':[False, '3e29 g/cm^3'],
+                          'w7_v_0': [False, '1 km/s'],
+                          'time_0':[True, None],
+                          'rho_0':[True, None],
+                          'v_0': [True, None],
+                          'exponent': [True, None],
+                          'value':[True, None]
+                        }
+                          },
+              'abundances':{ 'type':[True, ['file|_:_|filetype|_:_|'
+                             'filename', 'uniform']],
+                             'filename':[True, None],
+                             'filetype':[False, None]
+                            }
+            },
+    'montecarlo':{'seed':[False, 23111963],
+                  'no_of_packets':[True, None],
+                  'iterations':[True, None],
+                  'black_body_sampling':{
+                                            'start': '1 angstrom',
+                                            'stop': '1000000 angstrom',
+                                            'num': '1.e+6',
+                                        },
+                  'last_no_of_packets':[False, -1],
+                  'no_of_virtual_packets':[False, 0],
+                  'enable_reflective_inner_boundary':[False, False],
+                  'inner_boundary_albedo':[False, 0.0],
+                  'convergence_strategy':{ 'type':[True,
+                  ['damped|_:_|damping_constant|_:_|t_inner|_:_|'
+                  't_rad|_:_|w|_:_|lock_t_inner_cycles|_:_|'
+                  't_inner_update_exponent','specific|_:_|threshold'
+                  '|_:_|fraction|_:_|hold_iterations|_:_|t_inner'
+                  '|_:_|t_rad|_:_|w|_:_|lock_t_inner_cycles|_:_|'
+                  'damping_constant|_:_|t_inner_update_exponent']],
+                           't_inner_update_exponent':[False, -0.5],
+                           'lock_t_inner_cycles':[False, 1],
+                           'hold_iterations':[True, 3],
+                           'fraction':[True, 0.8],
+                           'damping_constant':[False, 0.5],
+                           'threshold':[True, None],
+                           't_inner':{ 'damping_constant':[False, 0.5],
+                                       'threshold': [False, None]
+                                     },
+                           't_rad':{'damping_constant':[False, 0.5],
+                                    'threshold':[True, None]
+                                    },
+                            'w':{'damping_constant': [False, 0.5],
+                                 'threshold': [True, None]
+                                 }
+                                        }
+                  },
+    'spectrum':[True, None]
+    })
+
+
+def _compile_config_schema(template):
+    """Flatten the configuration template into a dictionary keyed by the
+    path of every key in it.
+
+    Each entry is a tuple (kind, options). The kind is 'dict' for keys
+    holding a nested dictionary, 'list' for keys holding a
+    (mandatory, default) tuple and 'value' for plain values. For keys that
+    take their value from a list of choices, options maps the name of
+    every choice to its position in that list; otherwise it is None.
+
+    """
+    schema = {}
+    stack = [((), template)]
+    while stack:
+        path, dictionary = stack.pop()
+        for key, value in dictionary.items():
+            keypath = path + (key,)
+            if isinstance(value, dict):
+                schema[keypath] = ('dict', None)
+                stack.append((keypath, value))
+            elif isinstance(value, tuple):
+                options = None
+                if isinstance(value[1], tuple):
+                    options = {}
+                    for i, option in enumerate(value[1]):
+                        options[option.partition(OPTION_SEPARATOR)[0]] = i
+                schema[keypath] = ('list', options)
+            else:
+                schema[keypath] = ('value', None)
+    return schema
+
+_CONFIG_SCHEMA = _compile_config_schema(_CONFIG_TEMPLATE)
+
 class ConfigEditor(QtGui.QWidget):
     """The configuration editor widget.
 
@@ -206,97 +463,11 @@ class ConfigEditor(QtGui.QWidget):
         """
         super(ConfigEditor, self).__init__(parent)
 
+        import yaml
+
         #Configurations from the input and template
         configDict = yaml.load(open(yamlconfigfile), Loader=yaml.CLoader)
-        templatedictionary ={'tardis_config_version':[True, 'v1.0'],
-            'supernova':{ 'luminosity_requested':[True, '1 solLum'],
-                          'time_explosion':[True, None],
-                          'distance':[False, None],
-                          'luminosity_wavelength_start':[False, '0 angstrom'],
-                          'luminosity_wavelength_end':[False, 'inf angstrom'],
-                        },
-            'atom_data':[True,'File Browser'],
-            'plasma':{ 'initial_t_inner':[False, '-1K'],
-                       'initial_t_rad':[False,'10000K'],
-                       'disable_electron_scattering':[False, False],
-                       'ionization':[True, None],
-                       'excitation':[True, None],
-                       'radiative_rates_type':[True, None],
-                       'line_interaction_type':[True, None],
-                       'w_epsilon':[False, 1e-10],
-                       'delta_treatment':[False, None],
-                       'nlte':{ 'species':[False, []],
-                                'coronal_approximation':[False, False],
-                                'classical_nebular':[False, False]
-                              }
-                      },
-            'model':{ 'structure':{'type':[True, ['file|_:_|filename|_:_|'
-            'filetype|_:_|v_inner_boundary|_:_|v_outer_boundary',
-            'specific|_:_|velocity|_:_|density']],
-                      'filename':[True, None],
-                      'filetype':[True, None],
-                      'v_inner_boundary':[False, '0 km/s'],
-                      'v_outer_boundary':[False, 'inf km/s'],
-                      'velocity':[True, None],
-                      'density':{ 'type':[True, ['branch85_w7|_:_|w7_time_0'
-                                    '|_:_|w7_time_0|_:_|w7_time_0',
-                                    'exponential|_:_|time_0|_:_|rho_0|_:_|'
-                                    'v_0','power_law|_:_|time_0|_:_|rho_0'
-                                    '|_:_|v_0|_:_|exponent','uniform|_:_|value']],
-                                  'w7_time_0':[False, '0.000231481 day'],
-                                  'w7_rho_0':[False, '3e29 g/cm^3'],
-                                  'w7_v_0': [False, '1 km/s'],
-                                  'time_0':[True, None],
-                                  'rho_0':[True, None],
-                                  'v_0': [True, None],
-                                  'exponent': [True, None],
-                                  'value':[True, None]
-                                }
-                                  },
-                      'abundances':{ 'type':[True, ['file|_:_|filetype|_:_|'
-                                     'filename', 'uniform']],
-                                     'filename':[True, None],
-                                     'filetype':[False, None]
-                                    }
-                    },
-            'montecarlo':{'seed':[False, 23111963],
-                          'no_of_packets':[True, None],
-                          'iterations':[True, None],
-                          'black_body_sampling':{
-                                                    'start': '1 angstrom',
-                                                    'stop': '1000000 angstrom',
-                                                    'num': '1.e+6',
-                                                },
-                          'last_no_of_packets':[False, -1],
-                          'no_of_virtual_packets':[False, 0],
-                          'enable_reflective_inner_boundary':[False, False],
-                          'inner_boundary_albedo':[False, 0.0],
-                          'convergence_strategy':{ 'type':[True,
-                          ['damped|_:_|damping_constant|_:_|t_inner|_:_|'
-                          't_rad|_:_|w|_:_|lock_t_inner_cycles|_:_|'
-                          't_inner_update_exponent','specific|_:_|threshold'
-                          '|_:_|fraction|_:_|hold_iterations|_:_|t_inner'
-                          '|_:_|t_rad|_:_|w|_:_|lock_t_inner_cycles|_:_|'
-                          'damping_constant|_:_|t_inner_update_exponent']],
-                                   't_inner_update_exponent':[False, -0.5],
-                                   'lock_t_inner_cycles':[False, 1],
-                                   'hold_iterations':[True, 3],
-                                   'fraction':[True, 0.8],
-                                   'damping_constant':[False, 0.5],
-                                   'threshold':[True, None],
-                                   't_inner':{ 'damping_constant':[False, 0.5],
-                                               'threshold': [False, None]
-                                             },
-                                   't_rad':{'damping_constant':[False, 0.5],
-                                            'threshold':[True, None]
-                                            },
-                                    'w':{'damping_constant': [False, 0.5],
-                                         'threshold': [True, None]
-                                         }
-                                                }
-                          },
-            'spectrum':[True, None]
-            }
+        templatedictionary = _clone_template(_CONFIG_TEMPLATE)
         self.match_dicts(configDict, templatedictionary)
 
         self.layout = QtGui.QVBoxLayout()
@@ -338,9 +509,9 @@ class ConfigEditor(QtGui.QWidget):
             dict1: dictionary
                 The dictionary of user provided configuration.
             dict2: dictionary
-                The template dictionary with all default values set. This
-                one may have some keys missing that are present in the
-                `dict1`. Such keys will be appended.
+                A copy of the template dictionary with all default values
+                set. This one may have some keys missing that are present
+                in the `dict1`. Such keys will be appended.
         Raises
         ------
             IOError
@@ -349,45 +520,36 @@ class ConfigEditor(QtGui.QWidget):
                 then this error is raised.
 
         """
-        for key in dict1:
-            if key in dict2:
-                if isinstance(dict2[key], dict):
-                    self.match_dicts(dict1[key], dict2[key])
-
-                elif isinstance(dict2[key], list):
-                    if isinstance(dict2[key][1], list):
-
-                        #options = dict2[key][1] #This is passed by reference.
-                        #So copy the list manually.
-                        options = [dict2[key][1][i] for i in range(
-                            len(dict2[key][1]))]
-
-                        for i in range(len(options)):
-                            options[i] = options[i].split('|_:_|')[0]
-
-                        optionselected = dict1[key]
-
-                        if optionselected in options:
-                            indexofselected = options.index(optionselected)
-                            temp = dict2[key][1][0]
-
-                            dict2[key][1][0] = dict2[key][1][indexofselected]
-                            dict2[key][1][indexofselected] = temp
-
-
-                        else:
-                            print('The selected and available options')
-                            print(optionselected)
-                            print(options)
-                            raise IOError("An invalid option was"
-                                          " provided in the input file")
-
-                else:
-                    dict2[key] = dict1[key]
-            else:
-                toappend = [False, dict1[key]]
-                dict2[key] = toappend
-
+        stack = [((), dict1, dict2)]
+        while stack:
+            path, userdict, templatedict = stack.pop()
+            for key in userdict:
+                if key not in templatedict:
+                    templatedict[key] = [False, userdict[key]]
+                    continue
+
+                keypath = path + (key,)
+                kind, options = _CONFIG_SCHEMA[keypath]
+                if kind == 'dict':
+                    stack.append((keypath, userdict[key], templatedict[key]))
+
+                elif options is not None:
+                    optionselected = userdict[key]
+                    try:
+                        indexofselected = options[optionselected]
+                    except (KeyError, TypeError):
+                        raise IOError("Invalid option %r provided in the "
+                            "input file for '%s'; available options: %r" % (
+                            optionselected, key, list(options)))
+
+                    choices = templatedict[key][1]
+                    choices[0], choices[indexofselected] = (
+                        choices[indexofselected], choices[0])
+
+                elif kind == 'value':
+                    templatedict[key] = userdict[key]
+
+    @Slot()
     def recalculate(self):
         """Recalculate and display the model from the modified data in
         the ConfigEditor.
@@ -409,6 +571,7 @@ class ModelViewer(QtGui.QWidget):
         self.model = None
         self.shell_info = {}
         self.line_info = []
+        self.line_interaction_cache = {}
 
         #functions
         self.createTable = tablecreator
@@ -416,23 +579,27 @@ class ModelViewer(QtGui.QWidget):
         #Shells widget
         self.shellWidget = self.make_shell_widget()
 
-        #Spectrum widget
-        self.spectrumWidget = self.make_spectrum_widget()
+        #Spectrum widget. Its plot is only created when the tab is first
+        #shown, see on_plot_tab_changed.
+        self.spectrum = None
+        self.spectrumWidget = QtGui.QWidget()
+        self.spectrumWidget.setLayout(QtGui.QVBoxLayout())
+        self.spectrumWidget.layout().setContentsMargins(0, 0, 0, 0)
 
         #Plot tab widget
         self.plotTabWidget = QtGui.QTabWidget()
         self.plotTabWidget.addTab(self.shellWidget,"&Shells")
         self.plotTabWidget.addTab(self.spectrumWidget, "S&pectrum")
+        self.plotTabWidget.currentChanged.connect(self.on_plot_tab_changed)
 
         #Table widget
         self.tablemodel = self.createTable([['Shell: '], ["Rad. temp", "Ws", "V"]],
                             (1, 0))
         self.tableview = QtGui.QTableView()
         self.tableview.setMinimumWidth(200)
-        self.tableview.connect(self.tableview.verticalHeader(),
-            QtCore.SIGNAL('sectionClicked(int)'), self.graph.highlight_shell)
-        self.tableview.connect(self.tableview.verticalHeader(),
-            QtCore.SIGNAL('sectionDoubleClicked(int)'),
+        self.tableview.verticalHeader().sectionClicked.connect(
+            self.graph.highlight_shell)
+        self.tableview.verticalHeader().sectionDoubleClicked.connect(
             self.on_header_double_clicked)
 
         #Label for text output
@@ -518,6 +685,15 @@ class ModelViewer(QtGui.QWidget):
         containerWidget.setLayout(self.graph_sublayout)
         return containerWidget
 
+    def on_plot_tab_changed(self, index):
+        """Create the spectrum plot the first time its tab is shown."""
+        if (self.plotTabWidget.widget(index) is not self.spectrumWidget or
+            self.spectrum is not None):
+            return
+        self.spectrumWidget.layout().addWidget(self.make_spectrum_widget())
+        if self.model:
+            self.plot_spectrum()
+
     def make_spectrum_widget(self):
         """Create the spectrum plot and associated buttons and append to
         a container widget. Return the container widget.
@@ -559,23 +735,23 @@ class ModelViewer(QtGui.QWidget):
         if model:
             self.change_model(model)
         self.tablemodel.update_table()
-        for index in self.shell_info.keys():
-            self.shell_info[index].update_tables()
+        for shell_info in self.shell_info.values():
+            shell_info.update_tables()
         self.plot_model()
         if self.graph_button.text == 'Ws':
             self.change_graph_to_ws()
-        self.plot_spectrum()
-        if self.spectrum_button.text == 'spec_virtual_flux_angstrom':
-            self.change_spectrum_to_spec_virtual_flux_angstrom()
+        if self.spectrum is not None:
+            self.plot_spectrum()
+            if self.spectrum_button.text == 'spec_virtual_flux_angstrom':
+                self.change_spectrum_to_spec_virtual_flux_angstrom()
         self.show()
 
     def change_model(self, model):
         """Reset the model set in the GUI."""
         self.model = model
-        self.tablemodel.arraydata = []
-        self.tablemodel.add_data(model.model.t_rad.value.tolist())
-        self.tablemodel.add_data(model.model.w.tolist())
-        self.tablemodel.add_data(model.model.velocity.value.tolist())
+        self.line_interaction_cache.clear()
+        self.tablemodel.reset_data([model.model.t_rad.value, model.model.w,
+            model.model.v_inner.value])
 
     def change_spectrum_to_spec_virtual_flux_angstrom(self):
         """Change the spectrum data to the virtual spectrum."""
@@ -607,9 +783,14 @@ class ModelViewer(QtGui.QWidget):
         """
         self.spectrum_button.setText(name)
         self.spectrum.dataplot[0].set_ydata(data)
+        limits = (self.spectrum.ax.get_xlim(), self.spectrum.ax.get_ylim())
         self.spectrum.ax.relim()
         self.spectrum.ax.autoscale()
-        self.spectrum.draw()
+        #Only the line has to be redrawn if the axes did not change
+        if limits == (self.spectrum.ax.get_xlim(), self.spectrum.ax.get_ylim()):
+            self.spectrum.blit_artist(self.spectrum.dataplot[0])
+        else:
+            self.spectrum.draw()
 
     def plot_spectrum(self):
         """Plot the spectrum and add labels to the graph."""
@@ -645,15 +826,14 @@ class ModelViewer(QtGui.QWidget):
         self.graph.ax1.set_title(name + ' vs Shell')
         self.graph.ax1.set_ylabel(name + ' ' + unit)
         normalizer = colors.Normalize(vmin=data.min(), vmax=data.max())
-        color_map = plt.cm.ScalarMappable(norm=normalizer, cmap=plt.cm.jet)
+        color_map = cm.ScalarMappable(norm=normalizer, cmap=cm.jet)
         color_map.set_array(data)
         self.graph.cb.set_clim(vmin=data.min(), vmax=data.max())
         self.graph.cb.update_normal(color_map)
         if unit == '(K)':
             unit = 'T (K)'
         self.graph.cb.set_label(unit)
-        for i, item in enumerate(data):
-            self.shells[i].set_facecolor(color_map.to_rgba(item))
+        self.shell_collection.set_facecolors(color_map.to_rgba(data))
         self.graph.draw()
 
     def plot_model(self):
@@ -677,8 +857,8 @@ class ModelViewer(QtGui.QWidget):
         self.shells = []
         t_rad_normalizer = colors.Normalize(vmin=self.model.model.t_rad.value.min(),
             vmax=self.model.model.t_rad.value.max())
-        t_rad_color_map = plt.cm.ScalarMappable(norm=t_rad_normalizer,
-            cmap=plt.cm.jet)
+        t_rad_color_map = cm.ScalarMappable(norm=t_rad_normalizer,
+            cmap=cm.jet)
         t_rad_color_map.set_array(self.model.model.t_rad.value)
         if self.graph.cb:
             self.graph.cb.set_clim(vmin=self.model.model.t_rad.value.min(),
@@ -693,21 +873,25 @@ class ModelViewer(QtGui.QWidget):
             self.model.model.r_inner.value[0])
 
         #self.graph.normalizing_factor = 8e-16
-        for i, t_rad in enumerate(self.model.model.t_rad.value):
-            r_inner = (self.model.model.r_inner.value[i] *
-                self.graph.normalizing_factor)
-            r_outer = (self.model.model.r_outer.value[i] *
-                self.graph.normalizing_factor)
-            self.shells.append(Shell(i, (0,0), r_inner, r_outer,
-                facecolor=t_rad_color_map.to_rgba(t_rad),
-                picker=self.graph.shell_picker))
-            self.graph.ax2.add_patch(self.shells[i])
-        self.graph.ax2.set_xlim(0,
-            self.model.model.r_outer.value[-1] *
-            self.graph.normalizing_factor)
-        self.graph.ax2.set_ylim(0,
-            self.model.model.r_outer.value[-1] *
-            self.graph.normalizing_factor)
+        r_inner = self.model.model.r_inner.value * self.graph.normalizing_factor
+        r_outer = self.model.model.r_outer.value * self.graph.normalizing_factor
+        facecolors = t_rad_color_map.to_rgba(self.model.model.t_rad.value)
+        for i in range(len(facecolors)):
+            self.shells.append(Shell(i, (0,0), r_inner[i], r_outer[i],
+                facecolor=facecolors[i]))
+        #Draw all shells as one artist instead of one patch per shell
+        self.shell_collection = PatchCollection(self.shells,
+            match_original=True, picker=self.graph.shell_picker)
+        self.graph.ax2.add_collection(self.shell_collection)
+        #Black RGBA edgecolors of all shells, copied when highlighting one
+        self.shell_edgecolors = np.tile((0., 0., 0., 1.),
+            (len(self.shells), 1))
+        #Squared radii for the shell picker, compared against all shells
+        #at once
+        self.shell_r_inner_sq = r_inner ** 2
+        self.shell_r_outer_sq = r_outer ** 2
+        self.graph.ax2.set_xlim(0, r_outer[-1])
+        self.graph.ax2.set_ylim(0, r_outer[-1])
         self.graph.figure.tight_layout()
         self.graph.draw()
 
@@ -730,9 +914,10 @@ class ShellInfo(QtGui.QDialog):
         self.atomstable = QtGui.QTableView()
         self.ionstable = QtGui.QTableView()
         self.levelstable = QtGui.QTableView()
-        self.atomstable.connect(self.atomstable.verticalHeader(),
-            QtCore.SIGNAL('sectionClicked(int)'),
+        self.atomstable.verticalHeader().sectionClicked.connect(
             self.on_atom_header_double_clicked)
+        self.ionstable.verticalHeader().sectionClicked.connect(
+            self.on_ion_header_double_clicked)
 
 
         self.table1_data = self.parent.model.plasma.abundance[
@@ -742,7 +927,7 @@ class ShellInfo(QtGui.QDialog):
             index_info=self.table1_data.index.values.tolist())
         self.ionsdata = None
         self.levelsdata = None
-        self.atomsdata.add_data(self.table1_data.values.tolist())
+        self.atomsdata.add_data(self.table1_data.values)
         self.atomstable.setModel(self.atomsdata)
 
         self.layout = QtGui.QHBoxLayout()
@@ -764,22 +949,17 @@ class ShellInfo(QtGui.QDialog):
             ['Count (Z = %d)' % self.current_atom_index]],
             iterate_header=(2, 0),
             index_info=self.table2_data.index.values.tolist())
-        normalized_data = []
-        for item in self.table2_data.values:
-            normalized_data.append(float(item /
-               self.parent.model.plasma.number_density[self.shell_index]
-               .ix[self.current_atom_index]))
-
+        atom_number_density = float(
+            self.parent.model.plasma.number_density[self.shell_index]
+            .ix[self.current_atom_index])
+        normalized_data = self.table2_data.values / atom_number_density
 
         self.ionsdata.add_data(normalized_data)
         self.ionstable.setModel(self.ionsdata)
-        self.ionstable.connect(self.ionstable.verticalHeader(), QtCore.SIGNAL(
-            'sectionClicked(int)'),self.on_ion_header_double_clicked)
         self.levelstable.hide()
         self.ionstable.setColumnWidth(0, 120)
         self.ionstable.show()
-        self.setGeometry(400, 150, 380, 400)
-        self.show()
+        self.set_width(380)
 
     def on_ion_header_double_clicked(self, index):
         """Called on double click of ion headers to show level populations."""
@@ -790,29 +970,36 @@ class ShellInfo(QtGui.QDialog):
             ['Count (Ion %d)' % self.current_ion_index]],
             iterate_header=(2, 0),
             index_info=self.table3_data.index.values.tolist())
-        normalized_data = []
-        for item in self.table3_data.values.tolist():
-            normalized_data.append(float(item /
-            self.table2_data.ix[self.current_ion_index]))
+        ion_number_density = float(self.table2_data.ix[self.current_ion_index])
+        normalized_data = self.table3_data.values / ion_number_density
         self.levelsdata.add_data(normalized_data)
         self.levelstable.setModel(self.levelsdata)
         self.levelstable.setColumnWidth(0, 120)
         self.levelstable.show()
-        self.setGeometry(400, 150, 580, 400)
-        self.show()
+        self.set_width(580)
 
     def update_tables(self):
-        """Update table data for shell info viewer."""
+        """Update table data for shell info viewer. Dialogs that have
+        been closed are skipped.
+
+        """
+        if not self.isVisible():
+            return
         self.table1_data = self.parent.model.plasma.number_density[
             self.shell_index]
         self.atomsdata.index_info=self.table1_data.index.values.tolist()
-        self.atomsdata.arraydata = []
-        self.atomsdata.add_data(self.table1_data.values.tolist())
-        self.atomsdata.update_table()
+        self.atomsdata.reset_data([self.table1_data.values])
         self.ionstable.hide()
         self.levelstable.hide()
-        self.setGeometry(400, 150, 200, 400)
-        self.show()
+        self.set_width(200)
+
+    def set_width(self, width):
+        """Resize the dialog to fit the tables shown. Nothing is done if
+        it already has the requested width.
+
+        """
+        if self.width() != width:
+            self.setGeometry(400, 150, width, 400)
 
 class LineInfo(QtGui.QDialog):
     """Dialog to show the line info used by spectrum widget."""
@@ -822,22 +1009,15 @@ class LineInfo(QtGui.QDialog):
         super(LineInfo, self).__init__(parent)
         self.createTable = tablecreator
         self.parent = parent
+        self.transition_table_cache = {}
         self.setGeometry(180 + len(self.parent.line_info) * 20, 150, 250, 400)
         self.setWindowTitle('Line Interaction: %.2f - %.2f (A) ' % (
             wavelength_start, wavelength_end,))
         self.layout = QtGui.QVBoxLayout()
-        packet_nu_line_interaction = analysis.LastLineInteraction.from_model(
-            self.parent.model)
-        packet_nu_line_interaction.packet_filter_mode = 'packet_nu'
-        packet_nu_line_interaction.wavelength_start = wavelength_start * u.angstrom
-        packet_nu_line_interaction.wavelength_end = wavelength_end * u.angstrom
-
-        line_in_nu_line_interaction = analysis.LastLineInteraction.from_model(
-            self.parent.model)
-        line_in_nu_line_interaction.packet_filter_mode = 'line_in_nu'
-        line_in_nu_line_interaction.wavelength_start = wavelength_start * u.angstrom
-        line_in_nu_line_interaction.wavelength_end = wavelength_end * u.angstrom
-
+        packet_nu_line_interaction = self.get_line_interaction('packet_nu',
+            wavelength_start, wavelength_end)
+        line_in_nu_line_interaction = self.get_line_interaction('line_in_nu',
+            wavelength_start, wavelength_end)
 
         self.layout.addWidget(LineInteractionTables(packet_nu_line_interaction,
             self.parent.model.plasma.atomic_data.atom_data, self.parent.model.plasma.lines, 'filtered by frequency of packet',
@@ -849,6 +1029,27 @@ class LineInfo(QtGui.QDialog):
         self.setLayout(self.layout)
         self.show()
 
+    def get_line_interaction(self, packet_filter_mode, wavelength_start,
+        wavelength_end):
+        """Return the line interaction analysis of the model for the
+        given packet filter mode and wavelength range.
+
+        The analyses are cached on the model viewer, so opening the line
+        info of the same range again does not filter the packets again.
+
+        """
+        key = (packet_filter_mode, round(wavelength_start, 3),
+            round(wavelength_end, 3))
+        cache = self.parent.line_interaction_cache
+        if key not in cache:
+            line_interaction = analysis.LastLineInteraction.from_model(
+                self.parent.model)
+            line_interaction.packet_filter_mode = packet_filter_mode
+            line_interaction.wavelength_start = wavelength_start * u.angstrom
+            line_interaction.wavelength_end = wavelength_end * u.angstrom
+            cache[key] = line_interaction
+        return cache[key]
+
     def get_data(self, wavelength_start, wavelength_end):
         """Fetch line info data for the specified wavelength range
         from the model and create ionstable.
@@ -856,6 +1057,7 @@ class LineInfo(QtGui.QDialog):
         """
         self.wavelength_start = wavelength_start * u.angstrom
         self.wavelength_end = wavelength_end * u.angstrom
+        self.transition_table_cache.clear()
         last_line_in_ids, last_line_out_ids = analysis.get_last_line_interaction(
             self.wavelength_start, self.wavelength_end, self.parent.model)
         self.last_line_in, self.last_line_out = (
@@ -876,30 +1078,26 @@ class LineInfo(QtGui.QDialog):
 
     def get_transition_table(self, lines, atom, ion):
         """Called by the two methods below to get transition table for
-        given lines, atom and ions.
+        given lines, atom and ions. Tables are cached until new line data
+        is fetched.
 
         """
+        key = (id(lines), atom, ion)
+        if key in self.transition_table_cache:
+            return self.transition_table_cache[key]
         grouped = lines.groupby(['atomic_number', 'ion_number'])
-        transitions_with_duplicates = lines.ix[grouped.groups[(atom, ion)]
-            ].groupby(['level_number_lower', 'level_number_upper']).groups
-        transitions = lines.ix[grouped.groups[(atom, ion)]
-            ].drop_duplicates().groupby(['level_number_lower',
-            'level_number_upper']).groups
-        transitions_count = []
-        transitions_parsed = []
-        for item in transitions.values():
-            c = 0
-            for ditem in transitions_with_duplicates.values():
-                c += ditem.count(item[0])
-            transitions_count.append(c)
-        s = 0
-        for item in transitions_count:
-            s += item
-        for index in range(len(transitions_count)):
-            transitions_count[index] /= float(s)
-        for key, value in transitions.items():
-            transitions_parsed.append("%d-%d (%.2f A)" % (key[0], key[1],
-                self.parent.model.atom_data.lines.ix[value[0]]['wavelength']))
+        ion_lines = lines.ix[grouped.groups[(atom, ion)]]
+        transitions = ion_lines.groupby(['level_number_lower',
+            'level_number_upper'])
+        transitions_count = transitions.size().values.astype(float)
+        transitions_count /= transitions_count.sum()
+        #The lines are rows of the atom data lines table, so the wavelength
+        #of each transition can be taken from the group itself
+        transitions_parsed = ["%d-%d (%.2f A)" % (lower, upper, wavelength)
+            for (lower, upper), wavelength in
+            transitions.wavelength.first().items()]
+        self.transition_table_cache[key] = (transitions_parsed,
+            transitions_count)
         return transitions_parsed, transitions_count
 
     def on_atom_clicked(self, index):
@@ -907,49 +1105,53 @@ class LineInfo(QtGui.QDialog):
         dialog created by the spectrum widget.
 
         """
-        self.transitionsin_parsed, self.transitionsin_count = (
-            self.get_transition_table(self.last_line_in,
-            self.ions_in[index][0], self.ions_in[index][1]))
-        self.transitionsout_parsed, self.transitionsout_count = (
-            self.get_transition_table(self.last_line_out,
-            self.ions_out[index][0], self.ions_out[index][1]))
-        self.transitionsindata = self.createTable([self.transitionsin_parsed,
-            ['Lines In']])
-        self.transitionsoutdata = self.createTable([self.transitionsout_parsed,
-            ['Lines Out']])
-        self.transitionsindata.add_data(self.transitionsin_count)
-        self.transitionsoutdata.add_data(self.transitionsout_count)
-        self.transitionsintable.setModel(self.transitionsindata)
-        self.transitionsouttable.setModel(self.transitionsoutdata)
-        self.transitionsintable.show()
-        self.transitionsouttable.show()
-        self.setGeometry(180 + len(self.parent.line_info) * 20, 150, 750, 400)
-        self.show()
+        self.show_transition_tables(index, self.transitionsintable,
+            self.transitionsouttable)
 
     def on_atom_clicked2(self, index):
         """Create and show transition table for the clicked item in the
         dialog created by the spectrum widget.
 
+        """
+        self.show_transition_tables(index, self.transitionsintable2,
+            self.transitionsouttable2)
+
+    def show_transition_tables(self, index, in_table, out_table):
+        """Fill the given tables with the transitions of the clicked ion
+        and show them.
+
         """
         self.transitionsin_parsed, self.transitionsin_count = (
-            self.get_transition_table(self.last_line_in, self.ions_in[index][0],
-            self.ions_in[index][1]))
+            self.get_transition_table(self.last_line_in,
+            self.ions_in[index][0], self.ions_in[index][1]))
         self.transitionsout_parsed, self.transitionsout_count = (
             self.get_transition_table(self.last_line_out,
             self.ions_out[index][0], self.ions_out[index][1]))
-        self.transitionsindata = self.createTable([self.transitionsin_parsed,
-            ['Lines In']])
-        self.transitionsoutdata = self.createTable([self.transitionsout_parsed,
-            ['Lines Out']])
-        self.transitionsindata.add_data(self.transitionsin_count)
-        self.transitionsoutdata.add_data(self.transitionsout_count)
-        self.transitionsintable2.setModel(self.transitionsindata)
-        self.transitionsouttable2.setModel(self.transitionsoutdata)
-        self.transitionsintable2.show()
-        self.transitionsouttable2.show()
+        self.transitionsindata = self.set_table_data(in_table,
+            [self.transitionsin_parsed, ['Lines In']],
+            self.transitionsin_count)
+        self.transitionsoutdata = self.set_table_data(out_table,
+            [self.transitionsout_parsed, ['Lines Out']],
+            self.transitionsout_count)
+        in_table.show()
+        out_table.show()
         self.setGeometry(180 + len(self.parent.line_info) * 20, 150, 750, 400)
         self.show()
 
+    def set_table_data(self, table, headerdata, count):
+        """Show the given headers and counts in the table. The model of
+        the table is created on first use and reset afterwards.
+
+        """
+        model = table.model()
+        if model is None:
+            model = self.createTable(headerdata)
+            model.add_data(count)
+            table.setModel(model)
+        else:
+            model.reset_data([count], headerdata=headerdata)
+        return model
+
 class LineInteractionTables(QtGui.QWidget):
     """Widget to hold the line interaction tables used by
     LineInfo which in turn is used by spectrum widget.
@@ -975,18 +1177,18 @@ class LineInteractionTables(QtGui.QWidget):
             line_interaction_species_group.groups.keys())
         species_symbols = [tardis.util.base.species_tuple_to_string(item) for item in self.species_selected]
         species_table_model = self.createTable([species_symbols, ['Species']])
-        species_abundances = (
-            line_interaction_species_group.wavelength.count().astype(float) /
-            line_interaction_analysis.last_line_in.wavelength.count()).astype(float).tolist()
-        species_abundances = list(map(float, species_abundances))
+        #Every packet belongs to exactly one species, so the species counts
+        #add up to the total number of packets.
+        species_counts = line_interaction_species_group.wavelength.count(
+            ).astype(float)
+        species_abundances = (species_counts / species_counts.sum()).values
         species_table_model.add_data(species_abundances)
         self.species_table.setModel(species_table_model)
 
-        line_interaction_species_group.wavelength.count()
         self.layout.addWidget(self.text_description)
         self.layout.addWidget(self.species_table)
-        self.species_table.connect(self.species_table.verticalHeader(),
-            QtCore.SIGNAL('sectionClicked(int)'), self.on_species_clicked)
+        self.species_table.verticalHeader().sectionClicked.connect(
+            self.on_species_clicked)
         self.layout.addWidget(self.transitions_table)
 
         self.setLayout(self.layout)
@@ -1010,29 +1212,32 @@ class LineInteractionTables(QtGui.QWidget):
         current_last_line_in['line_id_out'] = current_last_line_out.line_id
 
 
-        last_line_in_string = []
-        last_line_count = []
         grouped_line_interactions = current_last_line_in.groupby(
                 ['line_id', 'line_id_out'])
         exc_deexc_string = 'exc. %d-%d (%.2f A) de-exc. %d-%d (%.2f A)'
 
-        for line_id, row in grouped_line_interactions.wavelength.count().iteritems():
-            current_line_in = self.lines_data.loc[line_id[0]]
-            current_line_out = self.lines_data.loc[line_id[1]]
-            last_line_in_string.append(exc_deexc_string % (
-                current_line_in['level_number_lower'],
-                current_line_in['level_number_upper'],
-                current_line_in['wavelength'],
-                current_line_out['level_number_upper'],
-                current_line_out['level_number_lower'],
-                current_line_out['wavelength']))
-            last_line_count.append(int(row))
-
-
-        last_line_in_model = self.createTable([last_line_in_string, [
-            'Num. pkts %d' % current_last_line_in.wavelength.count()]])
-        last_line_in_model.add_data(last_line_count)
-        self.transitions_table.setModel(last_line_in_model)
+        line_interaction_counts = grouped_line_interactions.wavelength.count()
+        #Look up the lines of all the interactions at once
+        lines_in = self.lines_data.loc[
+            line_interaction_counts.index.get_level_values(0)]
+        lines_out = self.lines_data.loc[
+            line_interaction_counts.index.get_level_values(1)]
+        last_line_in_string = [exc_deexc_string % line for line in zip(
+            lines_in['level_number_lower'], lines_in['level_number_upper'],
+            lines_in['wavelength'], lines_out['level_number_upper'],
+            lines_out['level_number_lower'], lines_out['wavelength'])]
+        last_line_count = line_interaction_counts.values
+
+        headerdata = [last_line_in_string, [
+            'Num. pkts %d' % current_last_line_in.wavelength.count()]]
+        last_line_in_model = self.transitions_table.model()
+        if last_line_in_model is None:
+            last_line_in_model = self.createTable(headerdata)
+            last_line_in_model.add_data(last_line_count)
+            self.transitions_table.setModel(last_line_in_model)
+        else:
+            last_line_in_model.reset_data([last_line_count],
+                headerdata=headerdata)
 
 class Tardis(QtGui.QMainWindow):
     """Create the top level window for the GUI and wait for call to
@@ -1077,9 +1282,10 @@ class Tardis(QtGui.QMainWindow):
         #     app.exec_()
 
         QtGui.QMainWindow.__init__(self, parent)
+        configure_matplotlib()
 
         #path to icons folder
-        self.path = os.path.join(tardis.__path__[0],'gui','images')
+        self.path = ICONS_PATH
 
         #Check if configuration file was provided
         self.mode = 'passive'
@@ -1100,24 +1306,18 @@ class Tardis(QtGui.QMainWindow):
 
         #Actions
         quitAction = QtGui.QAction("&Quit", self)
-        quitAction.setIcon(QtGui.QIcon(os.path.join(self.path,
-            'closeicon.png')))
-        quitAction.triggered.connect(self.close)
+        quitAction.setIcon(load_icon('closeicon.png'))
 
         self.viewMdv = QtGui.QAction("View &Model", self)
-        self.viewMdv.setIcon(QtGui.QIcon(os.path.join(self.path,
-            'mdvswitch.png')))
+        self.viewMdv.setIcon(load_icon('mdvswitch.png'))
         self.viewMdv.setCheckable(True)
         self.viewMdv.setChecked(True)
         self.viewMdv.setEnabled(False)
-        self.viewMdv.triggered.connect(self.switch_to_mdv)
 
         self.viewForm = QtGui.QAction("&Edit Model", self)
-        self.viewForm.setIcon(QtGui.QIcon(os.path.join(self.path,
-            'formswitch.png')))
+        self.viewForm.setIcon(load_icon('formswitch.png'))
         self.viewForm.setCheckable(True)
         self.viewForm.setEnabled(False)
-        self.viewForm.triggered.connect(self.switch_to_form)
 
         #Menubar
         self.fileMenu = self.menuBar().addMenu("&File")
@@ -1137,6 +1337,11 @@ class Tardis(QtGui.QMainWindow):
         viewToolbar.addAction(self.viewMdv)
         viewToolbar.addAction(self.viewForm)
 
+        #Connect all actions at once, after they have been constructed
+        quitAction.triggered.connect(self.close)
+        self.viewMdv.triggered.connect(self.switch_to_mdv)
+        self.viewForm.triggered.connect(self.switch_to_form)
+
         #Central Widget
         self.stackedWidget = QtGui.QStackedWidget()
         self.mdv = ModelViewer(tablemodel)
@@ -1178,15 +1383,18 @@ class Tardis(QtGui.QMainWindow):
         self.mdv.fill_output_label()
         self.mdv.tableview.setModel(self.mdv.tablemodel)
         self.mdv.plot_model()
-        self.mdv.plot_spectrum()
+        if self.mdv.spectrum is not None:
+            self.mdv.plot_spectrum()
         self.showMaximized()
 
 
+    @Slot()
     def switch_to_mdv(self):
         """Switch the cental stacked widget to show the modelviewer."""
         self.stackedWidget.setCurrentIndex(0)
         self.viewForm.setChecked(False)
 
+    @Slot()
     def switch_to_form(self):
         """Switch the cental stacked widget to show the ConfigEditor."""
         self.stackedWidget.setCurrentIndex(1)